@@ -9,6 +9,12 @@ import plotly.express as px
 from datetime import datetime
 import time
 import random
+import atexit
+import queue
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Set page configuration
 st.set_page_config(
@@ -77,6 +83,568 @@ def call_api(url, method="GET", payload=None):
         st.error(f"Error calling API: {str(e)}")
         return None
 
+logger = logging.getLogger(__name__)
+
+# Feedback storage settings
+FEEDBACK_DB_PATH = os.environ.get("FEEDBACK_DB_PATH", "feedback.db")
+FEEDBACK_QUEUE_SIZE = 500       # max pending submissions before backpressure kicks in
+FEEDBACK_BATCH_SIZE = 50        # max rows written per transaction
+FEEDBACK_FLUSH_INTERVAL = 2.0   # seconds to wait for more rows before flushing a batch
+FEEDBACK_PUT_TIMEOUT = 0.5      # seconds a submit may block when the queue is full
+FEEDBACK_RETRY_INTERVAL = 2.0   # seconds between attempts after a connect or write error
+FEEDBACK_MAX_RETRIES = 5        # failed attempts before a batch is counted as lost
+FEEDBACK_CLOSE_TIMEOUT = 5.0    # seconds shutdown waits for the final flush
+
+class FeedbackWriter:
+    """Write-behind queue that persists feedback to SQLite from a background thread"""
+
+    def __init__(self, db_path, maxsize=FEEDBACK_QUEUE_SIZE, batch_size=FEEDBACK_BATCH_SIZE,
+                 flush_interval=FEEDBACK_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.written = 0
+        self.rejected = 0
+        self.failed = 0     # connect/write attempts that raised
+        self.lost = 0       # rows dropped after FEEDBACK_MAX_RETRIES failed attempts
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, rating, comments):
+        """Queue one submission; returns False if the writer is down or the queue stayed full (backpressure)"""
+        if self._stop.is_set() or not self._thread.is_alive():
+            self.rejected += 1
+            return False
+        try:
+            self.queue.put((datetime.now().isoformat(), int(rating), comments), timeout=FEEDBACK_PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            logger.warning("Feedback queue full (depth %d), submission rejected", self.depth())
+            return False
+
+    def depth(self):
+        """Number of submissions waiting to be written"""
+        return self.queue.qsize()
+
+    def close(self):
+        """Flush everything still queued and stop the writer thread (bounded by FEEDBACK_CLOSE_TIMEOUT)"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=FEEDBACK_CLOSE_TIMEOUT)
+
+    def _run(self):
+        conn = None
+        batch = []
+        attempts = 0
+        while True:
+            stopping = self._stop.is_set()
+            if stopping:
+                batch.extend(self._drain())
+            elif len(batch) < self.batch_size:
+                batch.extend(self._collect(self.batch_size - len(batch)))
+            
+            if batch:
+                if conn is None:
+                    conn = self._connect()
+                if conn is not None and self._write(conn, batch):
+                    batch = []
+                    attempts = 0
+                else:
+                    # Reconnect on the next attempt in case the connection itself is broken
+                    if conn is not None:
+                        conn.close()
+                        conn = None
+                    attempts += 1
+                    if attempts >= FEEDBACK_MAX_RETRIES:
+                        self.lost += len(batch)
+                        logger.error("Dropped %d feedback rows after %d failed attempts (%d lost in total): %s",
+                                     len(batch), attempts, self.lost, self.last_error)
+                        batch = []
+                        attempts = 0
+                    elif not stopping:
+                        self._stop.wait(FEEDBACK_RETRY_INTERVAL)
+            
+            if stopping and not batch:
+                break
+        if conn is not None:
+            conn.close()
+
+    def _collect(self, limit):
+        # Wait up to flush_interval for the first row, then keep filling until the batch deadline
+        items = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(items) < limit and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _connect(self):
+        # Called on the writer thread; SQLite connections must be used by the thread that made them
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("""CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submitted_at TEXT NOT NULL,
+                rating INTEGER NOT NULL,
+                comments TEXT
+            )""")
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            self.failed += 1
+            self.last_error = str(e)
+            logger.warning("Could not open feedback database %s: %s", self.db_path, e)
+            return None
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany("INSERT INTO feedback (submitted_at, rating, comments) VALUES (?, ?, ?)", batch)
+            self.written += len(batch)
+            logger.debug("Wrote %d feedback rows (%d total, queue depth %d)", len(batch), self.written, self.depth())
+            return True
+        except sqlite3.Error as e:
+            self.failed += 1
+            self.last_error = str(e)
+            logger.warning("Could not write %d feedback rows: %s", len(batch), e)
+            return False
+
+# One writer per server process, shared by all sessions and reruns
+@st.cache_resource
+def get_feedback_writer():
+    writer = FeedbackWriter(FEEDBACK_DB_PATH)
+    atexit.register(writer.close)
+    return writer
+
+# Derived metrics: dependency graph from assessment inputs to displayed values and charts.
+# Only open space is applied locally; every other input needs a fresh backend assessment.
+LOCAL_INPUTS = {'open_space'}
+BACKEND_INPUTS = {'name', 'location', 'dwellers', 'roof_area', 'roof_type', 'roof_age'}
+
+# Input name -> default used when the backend response omits it
+DERIVED_INPUTS = {
+    'annual_harvestable_water': 0,
+    'installation_cost': 0,
+    'annual_rainfall': 0,
+    'water_depth': 0,
+    'runoff_coefficient': 0,
+    'monthly_breakdown': None,
+    'dwellers': 1,
+    'open_space': 0,
+    'roof_area': 0,
+    'roof_type': 'Concrete',
+    'roof_age': 5,
+}
+
+# Average water consumption per person per day (in liters)
+DAILY_CONSUMPTION_PER_PERSON = 150
+
+COLLECTION_EFFICIENCY_VALUES = {
+    'Metal': 0.95,
+    'Concrete': 0.85,
+    'Tile': 0.80,
+    'Asphalt': 0.75,
+    'Green': 0.60,
+    'Thatch': 0.50
+}
+
+def _potential_savings(annual_harvestable_water, dwellers):
+    # Potential savings is the minimum of harvestable water and annual consumption
+    annual_consumption = dwellers * DAILY_CONSUMPTION_PER_PERSON * 365
+    return min(annual_harvestable_water, annual_consumption)
+
+def _collection_efficiency(roof_type, roof_age):
+    base_collection_eff = COLLECTION_EFFICIENCY_VALUES.get(roof_type, 0.80)
+    # Adjust for roof age (1% reduction per year, max 30% reduction)
+    age_reduction = min(roof_age * 0.01, 0.30)
+    return max(0.5, base_collection_eff * (1 - age_reduction))
+
+def _storage_efficiency(roof_area):
+    # Larger systems typically have better storage efficiency (roof area as proxy for storage size)
+    if roof_area > 150:
+        return 0.95  # Large systems
+    elif roof_area > 80:
+        return 0.90  # Medium systems
+    return 0.85  # Small systems
+
+def _water_balance_df(annual_harvestable_water, water_depth, annual_rainfall, open_space):
+    return pd.DataFrame({
+        'Component': ['Harvestable Water', 'Ground Water', 'Annual Rainfall'],
+        'Volume (liters)': [
+            annual_harvestable_water,
+            water_depth * 1000,
+            annual_rainfall * open_space
+        ]
+    })
+
+def _efficiency_df(runoff_coefficient, collection_efficiency, storage_efficiency, overall_efficiency):
+    return pd.DataFrame({
+        'Metric': ['Runoff Coefficient', 'Collection Efficiency', 'Storage Efficiency', 'Overall System Efficiency'],
+        'Value': [
+            runoff_coefficient,
+            round(collection_efficiency, 3),
+            round(storage_efficiency, 3),
+            round(overall_efficiency, 3)
+        ],
+        'Unit': ['ratio', 'ratio', 'ratio', 'ratio']
+    })
+
+def _monthly_rainfall_fig(monthly_breakdown):
+    if monthly_breakdown is None:
+        return None
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    return px.bar(x=months, y=monthly_breakdown,
+                  labels={'x': 'Month', 'y': 'Rainfall (mm)'},
+                  title="Monthly Rainfall Pattern")
+
+def _cost_benefit_fig(cumulative_savings):
+    years = list(range(1, 11))
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=years, y=cumulative_savings, mode='lines+markers', name='Cumulative Savings'))
+    fig.add_hline(y=0, line_dash="dash", line_color="green", annotation_text="Break-even point")
+    fig.update_layout(title="10-Year Financial Projection", xaxis_title="Years", yaxis_title="Cumulative Savings (₹)")
+    return fig
+
+def _water_balance_fig(water_balance_df):
+    return px.pie(water_balance_df, values='Volume (liters)', names='Component',
+                  title="Water Balance Distribution")
+
+def _runoff_gauge_fig(runoff_coefficient):
+    return go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = runoff_coefficient * 100,
+        title = {'text': "Runoff Efficiency (%)"},
+        gauge = {'axis': {'range': [0, 100]},
+                 'bar': {'color': "#1f77b4"},
+                 'steps': [
+                     {'range': [0, 50], 'color': "lightgray"},
+                     {'range': [50, 80], 'color': "gray"},
+                     {'range': [80, 100], 'color': "lightgreen"}]
+                }
+    ))
+
+# Node name -> (dependencies, function called with those dependencies as keyword arguments)
+DERIVED_NODES = {
+    'potential_savings': (('annual_harvestable_water', 'dwellers'), _potential_savings),
+    'maintenance_cost': (('installation_cost',), lambda installation_cost: installation_cost * 0.05),
+    'annual_financial_savings': (('annual_harvestable_water',), lambda annual_harvestable_water: annual_harvestable_water * 0.005),
+    'cumulative_savings': (('installation_cost', 'annual_financial_savings'),
+                           lambda installation_cost, annual_financial_savings:
+                               [annual_financial_savings * year - installation_cost for year in range(1, 11)]),
+    'recharge_potential': (('annual_harvestable_water',), lambda annual_harvestable_water: annual_harvestable_water * 0.7),
+    'collection_efficiency': (('roof_type', 'roof_age'), _collection_efficiency),
+    'storage_efficiency': (('roof_area',), _storage_efficiency),
+    'overall_efficiency': (('runoff_coefficient', 'collection_efficiency', 'storage_efficiency'),
+                           lambda runoff_coefficient, collection_efficiency, storage_efficiency:
+                               runoff_coefficient * collection_efficiency * storage_efficiency),
+    'recommended_size': (('roof_area',), lambda roof_area: roof_area * 0.8),
+    'space_needed': (('open_space',), lambda open_space: open_space * 0.3),
+    'water_balance_df': (('annual_harvestable_water', 'water_depth', 'annual_rainfall', 'open_space'), _water_balance_df),
+    'efficiency_df': (('runoff_coefficient', 'collection_efficiency', 'storage_efficiency', 'overall_efficiency'), _efficiency_df),
+    'monthly_rainfall_fig': (('monthly_breakdown',), _monthly_rainfall_fig),
+    'cost_benefit_fig': (('cumulative_savings',), _cost_benefit_fig),
+    'water_balance_fig': (('water_balance_df',), _water_balance_fig),
+    'runoff_gauge_fig': (('runoff_coefficient',), _runoff_gauge_fig),
+}
+
+class DerivedMetrics:
+    """Lazily computed derived values that are invalidated only when their inputs change"""
+
+    def __init__(self, nodes, input_defaults):
+        self.nodes = nodes
+        self.input_defaults = input_defaults
+        self.inputs = {}
+        self.values = {}
+        # Reverse edges: name -> nodes that depend on it directly
+        self.dependents = {}
+        for name, (deps, _) in nodes.items():
+            for dep in deps:
+                self.dependents.setdefault(dep, []).append(name)
+
+    def set_inputs(self, data):
+        """Update inputs from a results dict; returns the set of nodes that were invalidated"""
+        invalidated = set()
+        for key, default in self.input_defaults.items():
+            value = data.get(key)
+            if value is None:
+                value = default
+            if key in self.inputs and self.inputs[key] == value:
+                continue
+            self.inputs[key] = value
+            self._invalidate(key, invalidated)
+        return invalidated
+
+    def get(self, name):
+        """Return a derived value (or input), computing it and its dependencies if stale"""
+        if name in self.inputs:
+            return self.inputs[name]
+        if name not in self.values:
+            deps, func = self.nodes[name]
+            self.values[name] = func(**{dep: self.get(dep) for dep in deps})
+        return self.values[name]
+
+    def _invalidate(self, name, invalidated):
+        for dependent in self.dependents.get(name, []):
+            if dependent not in invalidated:
+                invalidated.add(dependent)
+                self.values.pop(dependent, None)
+                self._invalidate(dependent, invalidated)
+
+def build_assessment_payload(user_data):
+    """Fields sent to the backend assessment endpoint"""
+    return {
+        "name": user_data['name'],
+        "location": user_data['location'],
+        "dwellers": user_data['dwellers'],
+        "roof_area": user_data['roof_area'],
+        "open_space": user_data['open_space'],
+        "roof_type": user_data['roof_type'],
+        "roof_age": user_data['roof_age']
+    }
+
+def apply_local_inputs(changes):
+    """Apply locally computable input changes to the current results without calling the backend"""
+    st.session_state.user_data.update(changes)
+    st.session_state.user_data['results'].update(changes)
+    if st.session_state.last_payload:
+        # Replace rather than mutate - other views hold references to the previous payload
+        st.session_state.last_payload = dict(st.session_state.last_payload, **changes)
+    return st.session_state.derived.set_inputs(st.session_state.user_data['results'])
+
+def recommendation_is_stale():
+    """True when open space was changed locally since the backend last assessed it"""
+    last_payload = st.session_state.last_payload
+    if not last_payload:
+        return False
+    return last_payload['open_space'] != st.session_state.assessed_open_space
+
+# Scenario comparison settings
+MAX_SCENARIOS = 4
+ROOF_TYPES = ['Concrete', 'Tiled', 'Metal', 'Asbestos', 'Thatched']
+
+def fetch_assessment(payload):
+    """Thread-safe assessment call; returns (result, error) instead of writing to the page"""
+    try:
+        response = requests.post(ASSESSMENTS_API_URL, json=payload, timeout=30)
+        if response.status_code != 200:
+            return None, f"API error: {response.status_code} - {response.text}"
+        data = response.json()
+    except Exception as e:
+        return None, f"Error calling API: {str(e)}"
+    
+    if isinstance(data, list) and len(data) > 0:
+        return data[0], None
+    elif isinstance(data, dict):
+        return data, None
+    return None, "Unexpected response format from API"
+
+def scenario_key(payload):
+    """Cache key for a scenario payload.
+
+    Open space is included even though the main view treats it as local: the backend's recommended
+    structure, cost and payback may depend on it, and comparing those is the point of a scenario.
+    """
+    return tuple(sorted((key, payload[key]) for key in BACKEND_INPUTS | LOCAL_INPUTS))
+
+def evaluate_scenarios(payloads, cache, failures):
+    """Evaluate payloads concurrently and return a (result, error) pair for each.
+
+    Only keys that are neither cached nor recorded as failed are fetched, so reruns cost nothing and
+    a failed key is retried only after it is removed from failures. Entries for payloads that are no
+    longer compared are pruned from both dicts.
+    """
+    in_use = {scenario_key(payload) for payload in payloads}
+    for store in (cache, failures):
+        for key in [key for key in store if key not in in_use]:
+            del store[key]
+    
+    pending = {}
+    for payload in payloads:
+        key = scenario_key(payload)
+        if key not in cache and key not in failures and key not in pending:
+            pending[key] = payload
+    
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {key: executor.submit(fetch_assessment, payload) for key, payload in pending.items()}
+        for key, future in futures.items():
+            result, error = future.result()
+            if error:
+                failures[key] = error
+            else:
+                cache[key] = result
+    
+    evaluated = []
+    for payload in payloads:
+        key = scenario_key(payload)
+        if key in cache:
+            evaluated.append((cache[key], None))
+        else:
+            evaluated.append((None, failures.get(key)))
+    return evaluated
+
+# Offline structure recommendation index
+STRUCTURE_DESCRIPTIONS = {
+    "Storage_Tank": "Ideal for direct usage with limited space. Suitable for urban areas with water scarcity issues.",
+    "Recharge_Pit": "Best for sandy soils with good permeability. Requires moderate open space.",
+    "Recharge_Trench": "Suitable for areas with limited space and moderate soil permeability.",
+    "Recharge_Shaft": "Recommended for deep water tables and areas with space constraints.",
+    "Percolation_Tank": "Ideal for large catchment areas with significant open space.",
+    "Combination_System": "Hybrid approach for optimal water management in diverse conditions."
+}
+
+# Rough indicative installation cost range (₹) for a medium roof. These are order-of-magnitude
+# placeholders chosen for the offline fallback, not backend output or a published schedule of rates;
+# the UI labels them as indicative and the backend's installation_cost takes precedence.
+STRUCTURE_BASE_COSTS = {
+    "Storage_Tank": (15000, 60000),
+    "Recharge_Pit": (8000, 25000),
+    "Recharge_Trench": (10000, 35000),
+    "Recharge_Shaft": (25000, 80000),
+    "Percolation_Tank": (60000, 200000),
+    "Combination_System": (40000, 120000)
+}
+
+ROOF_COST_FACTORS = {'small': 0.75, 'medium': 1.0, 'large': 1.5, 'other': 1.0}
+
+# Keyword -> class, checked in order against the lower-cased backend value
+SOIL_CLASSES = [('sand', 'sandy'), ('loam', 'loamy'), ('clay', 'clay'), ('rock', 'rocky'), ('laterite', 'rocky')]
+AQUIFER_CLASSES = [('alluvi', 'alluvial'), ('hard', 'hard_rock'), ('rock', 'hard_rock'), ('unconfined', 'unconfined'), ('confined', 'confined')]
+
+# Upper bounds (exclusive) for each band; values above the last bound fall in the final band,
+# missing values (e.g. water depth before the backend responds) fall in 'other'
+WATER_DEPTH_BANDS = [(3, 'shallow'), (8, 'moderate'), (20, 'deep')], 'very_deep'
+OPEN_SPACE_BANDS = [(10, 'minimal'), (50, 'small'), (200, 'medium')], 'large'
+ROOF_AREA_BANDS = [(50, 'small'), (150, 'medium')], 'large'
+
+def _classify(value, classes):
+    text = str(value or '').lower()
+    for keyword, name in classes:
+        if keyword in text:
+            return name
+    return 'other'
+
+def _band(value, bands):
+    if value is None:
+        return 'other'
+    bounds, last = bands
+    for upper, name in bounds:
+        if value < upper:
+            return name
+    return last
+
+def _band_names(bands):
+    return [name for _, name in bands[0]] + [bands[1], 'other']
+
+def _score_structures(soil, aquifer, depth, open_space, roof):
+    """Rule-based suitability scores used to precompute the lookup index.
+
+    The weights are hand-tuned heuristics that encode the guidance in STRUCTURE_DESCRIPTIONS
+    (pits for permeable soils, shafts for deep water tables, percolation tanks for large open
+    space, tanks where space is limited); 'other' classes and bands contribute nothing.
+    """
+    permeable = soil in ('sandy', 'loamy')
+    no_space = open_space == 'minimal'
+    scores = {
+        "Storage_Tank": 1 + 2 * (depth == 'shallow') + 2 * no_space + (soil in ('clay', 'rocky')),
+        "Recharge_Pit": 1 + 2 * permeable + (open_space in ('small', 'medium')) + (depth == 'moderate') - 3 * no_space,
+        "Recharge_Trench": 1 + (soil in ('loamy', 'clay')) + 2 * (open_space == 'small') + (roof == 'large') - 3 * no_space,
+        "Recharge_Shaft": 3 * (depth in ('deep', 'very_deep')) + 2 * (soil in ('clay', 'rocky')) + no_space
+                          + (aquifer == 'confined') - 3 * (depth == 'shallow'),
+        "Percolation_Tank": 3 * (open_space == 'large') + permeable + (roof == 'large') - 3 * (open_space != 'large'),
+        "Combination_System": 2 * (roof == 'large') + (open_space in ('medium', 'large')) + (aquifer == 'hard_rock'),
+    }
+    if depth == 'shallow':
+        # Recharge adds little where the water table is already near the surface
+        for structure in ("Recharge_Pit", "Recharge_Trench", "Percolation_Tank"):
+            scores[structure] -= 1
+    ranked = sorted(((score, structure) for structure, score in scores.items() if score > 0),
+                    key=lambda item: (-item[0], item[1]))
+    factor = ROOF_COST_FACTORS[roof]
+    return [(structure, STRUCTURE_BASE_COSTS[structure][0] * factor, STRUCTURE_BASE_COSTS[structure][1] * factor)
+            for _, structure in ranked[:3]]
+
+def build_structure_index():
+    """Precompute ranked structures for every soil/aquifer/depth/open-space/roof-area combination"""
+    soils = sorted({name for _, name in SOIL_CLASSES}) + ['other']
+    aquifers = sorted({name for _, name in AQUIFER_CLASSES}) + ['other']
+    depths = _band_names(WATER_DEPTH_BANDS)
+    open_spaces = _band_names(OPEN_SPACE_BANDS)
+    roofs = _band_names(ROOF_AREA_BANDS)
+    return {
+        (soil, aquifer, depth, open_space, roof): _score_structures(soil, aquifer, depth, open_space, roof)
+        for soil in soils for aquifer in aquifers for depth in depths for open_space in open_spaces for roof in roofs
+    }
+
+# Built once per server process
+@st.cache_resource
+def load_structure_index():
+    return build_structure_index()
+
+def lookup_structures(index, results):
+    """Ranked (structure, min cost, max cost) list for an assessment result or raw sidebar inputs"""
+    key = (
+        _classify(results.get('soil_type'), SOIL_CLASSES),
+        _classify(results.get('aquifer_type'), AQUIFER_CLASSES),
+        _band(results.get('water_depth'), WATER_DEPTH_BANDS),
+        _band(results.get('open_space'), OPEN_SPACE_BANDS),
+        _band(results.get('roof_area'), ROOF_AREA_BANDS)
+    )
+    return index.get(key, [])
+
+def recommended_structure_for(index, results):
+    """(structure, is_estimate): the backend recommendation, or the top lookup entry when it has none"""
+    if results.get('recommended_structure'):
+        return results['recommended_structure'], False
+    ranked = lookup_structures(index, results)
+    if ranked:
+        return ranked[0][0], True
+    return None, False
+
+def structure_label(structure, is_estimate):
+    if structure is None:
+        return 'N/A'
+    return f"{structure} (estimate)" if is_estimate else structure
+
+def structure_candidates_df(ranked):
+    return pd.DataFrame({
+        'Structure': [structure for structure, _, _ in ranked],
+        'Indicative Cost Range (₹, rough)': [f"{low:,.0f} - {high:,.0f}" for _, low, high in ranked],
+        'Description': [STRUCTURE_DESCRIPTIONS.get(structure, '') for structure, _, _ in ranked]
+    })
+
+def render_provisional_recommendation(index, user_data, reason):
+    """Instant recommendation from the sidebar inputs while backend site data is pending or unavailable"""
+    ranked = lookup_structures(index, user_data)
+    if not ranked:
+        return
+    st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+    st.markdown(f"### Provisional Recommendation: {ranked[0][0]}")
+    st.write(STRUCTURE_DESCRIPTIONS.get(ranked[0][0], "No description available."))
+    st.caption(f"{reason} This estimate uses only your roof area and open space - soil, aquifer and water depth "
+               "are not known yet - and will be replaced by the full assessment.")
+    st.markdown('</div>', unsafe_allow_html=True)
+    st.dataframe(structure_candidates_df(ranked), hide_index=True, use_container_width=True)
+    st.caption("Cost ranges are rough indicative figures, not quotes.")
+
 # App title and description
 st.markdown('<p class="main-header">💧 Roof Top Rain Water Harvesting Assessment Tool</p>', unsafe_allow_html=True)
 st.markdown("""
@@ -101,6 +669,34 @@ if 'user_data' not in st.session_state:
 if 'calculation_done' not in st.session_state:
     st.session_state.calculation_done = False
 
+structure_index = load_structure_index()
+
+# Set when the last assessment call failed, so the provisional recommendation can say why
+if 'assessment_failed' not in st.session_state:
+    st.session_state.assessment_failed = False
+
+if 'derived' not in st.session_state:
+    st.session_state.derived = DerivedMetrics(DERIVED_NODES, DERIVED_INPUTS)
+
+# Payload behind the current results, used to skip the backend for local-only changes
+if 'last_payload' not in st.session_state:
+    st.session_state.last_payload = None
+
+# Open space the backend recommendation and cost were computed for
+if 'assessed_open_space' not in st.session_state:
+    st.session_state.assessed_open_space = None
+
+# Scenario variants (label + input overrides) and backend results shared across them
+if 'scenarios' not in st.session_state:
+    st.session_state.scenarios = []
+
+if 'scenario_cache' not in st.session_state:
+    st.session_state.scenario_cache = {}
+
+# scenario_key -> error message for evaluations that failed and have not been retried
+if 'scenario_failures' not in st.session_state:
+    st.session_state.scenario_failures = {}
+
 # Sidebar for user input
 with st.sidebar:
     st.header("📋 User Input")
@@ -120,7 +716,7 @@ with st.sidebar:
                                                                  value=st.session_state.user_data['open_space'])
         
         st.session_state.user_data['roof_type'] = st.selectbox("Roof Type", 
-                                                              ['Concrete', 'Tiled', 'Metal', 'Asbestos', 'Thatched'],
+                                                              ROOF_TYPES,
                                                               index=0)
         
         st.session_state.user_data['roof_age'] = st.slider("Roof Age (years)", min_value=0, max_value=50, 
@@ -170,45 +766,73 @@ with st.sidebar:
     st.markdown("---")
 
 # Main content area
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏠 Assessment", "💡 Recommendations", "📊 Results", "🌊 Groundwater Info", "ℹ About"])
-
-if submitted:
-    with st.spinner("Calculating your rainwater harvesting potential..."):
-        # Create assessment payload
-        assessment_payload = {
-            "name": st.session_state.user_data['name'],
-            "location": st.session_state.user_data['location'],
-            "dwellers": st.session_state.user_data['dwellers'],
-            "roof_area": st.session_state.user_data['roof_area'],
-            "open_space": st.session_state.user_data['open_space'],
-            "roof_type": st.session_state.user_data['roof_type'],
-            "roof_age": st.session_state.user_data['roof_age']
-        }
-        
-        # Call the API
-        assessment_response = call_api(ASSESSMENTS_API_URL, "POST", assessment_payload)
-        
-        # Debug: Show what we received
-        st.write("API Response:", assessment_response)
-        
-        if assessment_response:
-            # Handle both list response and single object response
-            if isinstance(assessment_response, list) and len(assessment_response) > 0:
-                # API returned a list - use the first item
-                st.session_state.user_data['results'] = assessment_response[0]
-                st.session_state.calculation_done = True
-                st.success("Assessment completed successfully!")
-                st.rerun()
-            elif isinstance(assessment_response, dict):
-                # API returned a single assessment object
-                st.session_state.user_data['results'] = assessment_response
-                st.session_state.calculation_done = True
-                st.success("Assessment completed successfully!")
-                st.rerun()
-            else:
-                st.error("Unexpected response format from API")
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🏠 Assessment", "💡 Recommendations", "📊 Results", "⚖ Compare Scenarios", "🌊 Groundwater Info", "ℹ About"])
+
+# Set by the "Re-run Full Assessment" button to bypass the local-only shortcut
+force_assessment = st.session_state.pop('force_assessment', False)
+
+if submitted or force_assessment:
+    # Create assessment payload
+    assessment_payload = build_assessment_payload(st.session_state.user_data)
+    last_payload = st.session_state.last_payload
+    changed = {key for key in assessment_payload if last_payload is None or assessment_payload[key] != last_payload.get(key)}
+
+    if (not force_assessment and st.session_state.calculation_done and st.session_state.user_data['results']
+            and not (changed & BACKEND_INPUTS)):
+        # Only locally derived inputs changed - recompute the affected metrics without a backend call
+        if changed:
+            apply_local_inputs({key: assessment_payload[key] for key in changed})
+            st.success("Assessment updated!")
         else:
-            st.error("API call failed. Please try again.")
+            st.info("Inputs unchanged - showing your current assessment.")
+    else:
+        # Show an instant recommendation in the Recommendations tab while the backend works
+        with tab2:
+            pending_recommendation = st.empty()
+            with pending_recommendation.container():
+                render_provisional_recommendation(structure_index, st.session_state.user_data,
+                                                  "Your assessment is still running.")
+        
+        with st.spinner("Calculating your rainwater harvesting potential..."):
+            # Call the API
+            assessment_response = call_api(ASSESSMENTS_API_URL, "POST", assessment_payload)
+            # The Recommendations tab renders its own fallback below
+            pending_recommendation.empty()
+            
+            # Debug: Show what we received
+            st.write("API Response:", assessment_response)
+            
+            if assessment_response:
+                # Handle both list response and single object response
+                if isinstance(assessment_response, list) and len(assessment_response) > 0:
+                    # API returned a list - use the first item
+                    st.session_state.user_data['results'] = assessment_response[0]
+                    st.session_state.last_payload = assessment_payload
+                    st.session_state.assessed_open_space = assessment_payload['open_space']
+                    st.session_state.calculation_done = True
+                    st.session_state.assessment_failed = False
+                    st.success("Assessment completed successfully!")
+                    st.rerun()
+                elif isinstance(assessment_response, dict):
+                    # API returned a single assessment object
+                    st.session_state.user_data['results'] = assessment_response
+                    st.session_state.last_payload = assessment_payload
+                    st.session_state.assessed_open_space = assessment_payload['open_space']
+                    st.session_state.calculation_done = True
+                    st.session_state.assessment_failed = False
+                    st.success("Assessment completed successfully!")
+                    st.rerun()
+                else:
+                    st.session_state.assessment_failed = True
+                    st.error("Unexpected response format from API")
+            else:
+                st.session_state.assessment_failed = True
+                st.error("API call failed. Please try again.")
+
+# Refresh graph inputs; only nodes downstream of changed values are recomputed
+derived = st.session_state.derived
+if st.session_state.calculation_done and st.session_state.user_data['results']:
+    derived.set_inputs(st.session_state.user_data['results'])
 
 with tab1:
     st.markdown('<p class="sub-header">Rainwater Harvesting Potential Assessment</p>', unsafe_allow_html=True)
@@ -227,7 +851,7 @@ with tab1:
         
         with col2:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Recommended Structure", results.get('recommended_structure', 'N/A'))
+            st.metric("Recommended Structure", structure_label(*recommended_structure_for(structure_index, results)))
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col3:
@@ -240,6 +864,9 @@ with tab1:
             st.metric("Payback Period", f"{results.get('payback_period', 0):.1f} years")
             st.markdown('</div>', unsafe_allow_html=True)
         
+        if recommendation_is_stale():
+            st.caption("Recommended structure, cost and payback reflect your last full assessment; open space has changed since.")
+        
         # Detailed results
         st.markdown("### Detailed Analysis")
         
@@ -253,17 +880,7 @@ with tab1:
             st.write(f"- Harvestable Water: {results.get('annual_harvestable_water', 0):.0f} liters")
     
             # Calculate Potential Savings based on household usage
-            harvestable_water = results.get('annual_harvestable_water', 0) or 0
-            dwellers = results.get('dwellers', 1)
-    
-            # Average water consumption per person per day (in liters)
-            daily_consumption_per_person = 150
-            annual_consumption = dwellers * daily_consumption_per_person * 365
-    
-            # Potential savings is the minimum of harvestable water and annual consumption
-            potential_savings = min(harvestable_water, annual_consumption)
-    
-            st.write(f"- Potential Savings: {potential_savings:.0f} liters/year")
+            st.write(f"- Potential Savings: {derived.get('potential_savings'):.0f} liters/year")
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
@@ -288,24 +905,20 @@ with tab1:
         if lat and lon:
             st.markdown("---")
             st.markdown("Update open space after measurement")
-            new_roof_area = st.number_input("Enter measured open space (sq. meters):", 
+            new_open_space = st.number_input("Enter measured open space (sq. meters):", 
                                            min_value=10, max_value=1000, 
                                            value=st.session_state.user_data['open_space'],
                                            key="update_roof")
             
             if st.button("Update Open Space", key="update_btn"):
-                st.session_state.user_data['open_space'] = new_roof_area
-                st.success("Roof area updated! Click 'Calculate Potential' again for updated results.")
+                # Open space only feeds locally derived metrics, so no new assessment is needed
+                apply_local_inputs({'open_space': new_open_space})
+                st.success("Open space updated! Space requirements and water balance have been recalculated.")
         
         # Rainfall visualization
         if 'monthly_breakdown' in results:
             st.markdown("### Monthly Rainfall Distribution")
-            months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-            
-            fig = px.bar(x=months, y=results['monthly_breakdown'], 
-                         labels={'x': 'Month', 'y': 'Rainfall (mm)'},
-                         title="Monthly Rainfall Pattern")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(derived.get('monthly_rainfall_fig'), use_container_width=True)
     else:
         st.info("Please fill out the form in the sidebar and click 'Calculate Potential' to see your assessment results.")
 
@@ -315,25 +928,36 @@ with tab2:
     if st.session_state.calculation_done and st.session_state.user_data['results']:
         results = st.session_state.user_data['results']
         
+        if recommendation_is_stale():
+            st.markdown('<div class="warning-box">', unsafe_allow_html=True)
+            st.write(f"This recommendation and its costs reflect your last full assessment "
+                     f"({st.session_state.assessed_open_space} sq.m open space). Open space is now "
+                     f"{st.session_state.last_payload['open_space']} sq.m, which may change the best structure.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            if st.button("🔄 Re-run Full Assessment", key="reassess_btn"):
+                st.session_state.force_assessment = True
+                st.rerun()
+        
         # Structure recommendations
-        recommended_structure = results.get('recommended_structure')
+        recommended_structure, is_estimate = recommended_structure_for(structure_index, results)
+        ranked_structures = lookup_structures(structure_index, results)
+        
+        if is_estimate:
+            st.caption("Backend recommendation unavailable - showing an instant estimate from local site data.")
         
         if recommended_structure:
             st.markdown(f'<div class="success-box">', unsafe_allow_html=True)
-            st.markdown(f"### Recommended: {recommended_structure}")
-            
-            structure_descriptions = {
-                "Storage_Tank": "Ideal for direct usage with limited space. Suitable for urban areas with water scarcity issues.",
-                "Recharge_Pit": "Best for sandy soils with good permeability. Requires moderate open space.",
-                "Recharge_Trench": "Suitable for areas with limited space and moderate soil permeability.",
-                "Recharge_Shaft": "Recommended for deep water tables and areas with space constraints.",
-                "Percolation_Tank": "Ideal for large catchment areas with significant open space.",
-                "Combination_System": "Hybrid approach for optimal water management in diverse conditions."
-            }
-            
-            st.write(structure_descriptions.get(recommended_structure, "No description available."))
+            st.markdown(f"### Recommended: {structure_label(recommended_structure, is_estimate)}")
+            st.write(STRUCTURE_DESCRIPTIONS.get(recommended_structure, "No description available."))
             st.markdown('</div>', unsafe_allow_html=True)
             
+            # Other candidates from the lookup index
+            alternatives = [item for item in ranked_structures if item[0] != recommended_structure]
+            if alternatives:
+                st.markdown("### Other Suitable Structures")
+                st.dataframe(structure_candidates_df(alternatives), hide_index=True, use_container_width=True)
+                st.caption("Cost ranges are rough indicative figures, not quotes; the cost analysis below uses your assessment.")
+            
             # Implementation details
             st.markdown("### Implementation Details")
             
@@ -342,32 +966,26 @@ with tab2:
             with col1:
                 st.markdown("Cost Analysis")
                 st.write(f"- Estimated Installation Cost: ₹{results.get('installation_cost', 0):.0f}")
-                st.write(f"- Annual Maintenance Cost: ₹{results.get('installation_cost', 0) * 0.05:.0f} (approx.)")
+                st.write(f"- Annual Maintenance Cost: ₹{derived.get('maintenance_cost'):.0f} (approx.)")
                 st.write(f"- Payback Period: {results.get('payback_period', 0):.1f} years")
                 
             with col2:
                 st.markdown("Benefits")
                 st.write(f"- Annual Water Savings: {results.get('annual_harvestable_water', 0):.0f} liters")
-                st.write(f"- Financial Savings: ₹{results.get('annual_harvestable_water', 0) * 0.005:.0f}/year (approx.)")
+                st.write(f"- Financial Savings: ₹{derived.get('annual_financial_savings'):.0f}/year (approx.)")
                 st.write(f"- Environmental Impact: Reduced groundwater extraction")
             
             # Visual representation of savings
             st.markdown("### Cost-Benefit Analysis")
-            
-            years = list(range(1, 11))
-            installation_cost = results.get('installation_cost', 0)
-            annual_savings = results.get('annual_harvestable_water', 0) * 0.005
-            cumulative_savings = [annual_savings * year - installation_cost for year in years]
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=years, y=cumulative_savings, mode='lines+markers', name='Cumulative Savings'))
-            fig.add_hline(y=0, line_dash="dash", line_color="green", annotation_text="Break-even point")
-            fig.update_layout(title="10-Year Financial Projection", xaxis_title="Years", yaxis_title="Cumulative Savings (₹)")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(derived.get('cost_benefit_fig'), use_container_width=True)
         else:
             st.warning("No specific recommendation available for your location.")
     else:
-        st.info("Complete the assessment to see personalized recommendations.")
+        if st.session_state.assessment_failed:
+            render_provisional_recommendation(structure_index, st.session_state.user_data,
+                                              "The assessment service is unavailable right now.")
+        else:
+            st.info("Complete the assessment to see personalized recommendations.")
 
 with tab3:
     st.markdown('<p class="sub-header">Detailed Results & Analysis</p>', unsafe_allow_html=True)
@@ -381,82 +999,20 @@ with tab3:
         with col1:
             st.markdown("### Water Balance Analysis")
             
-            water_data = {
-                'Component': ['Harvestable Water', 'Ground Water', 'Annual Rainfall'],
-                'Volume (liters)': [
-                    results.get('annual_harvestable_water', 0),
-                    results.get('water_depth', 0) * 1000,
-                    results.get('annual_rainfall', 0) * results.get('open_space', 0)
-                ]
-            }
-            
-            water_df = pd.DataFrame(water_data)
+            water_df = derived.get('water_balance_df')
             st.dataframe(water_df, hide_index=True, use_container_width=True)
             
             # Water balance chart
-            fig = px.pie(water_df, values='Volume (liters)', names='Component', 
-                         title="Water Balance Distribution")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(derived.get('water_balance_fig'), use_container_width=True)
         
         with col2:
             st.markdown("### System Efficiency")
-            # Calculate efficiencies based on available results
-            roof_type = results.get('roof_type', 'Concrete')
-            roof_age = results.get('roof_age', 5)
-
-            # Collection Efficiency calculation based on roof type and age
-            collection_efficiency_values = {
-                'Metal': 0.95,
-                'Concrete': 0.85,
-                'Tile': 0.80,
-                'Asphalt': 0.75,
-                'Green': 0.60,
-                'Thatch': 0.50
-            }
-            base_collection_eff = collection_efficiency_values.get(roof_type, 0.80)
-
-            # Adjust for roof age (1% reduction per year, max 30% reduction)
-            age_reduction = min(roof_age * 0.01, 0.30)
-            collection_efficiency = max(0.5, base_collection_eff * (1 - age_reduction))
-
-            # Storage Efficiency calculation (based on roof area as proxy for storage size)
-            roof_area = results.get('roof_area', 50)
-            # Larger systems typically have better storage efficiency
-            if roof_area > 150:
-                storage_efficiency = 0.95  # Large systems
-            elif roof_area > 80:
-                storage_efficiency = 0.90  # Medium systems
-            else:
-                storage_efficiency = 0.85  # Small systems
-
-            efficiency_data = {
-                'Metric': ['Runoff Coefficient', 'Collection Efficiency', 'Storage Efficiency', 'Overall System Efficiency'],
-                'Value': [
-                    results.get('runoff_coefficient', 0),
-                    round(collection_efficiency, 3),
-                    round(storage_efficiency, 3),
-                    round(results.get('runoff_coefficient', 0) * collection_efficiency * storage_efficiency, 3)
-                ],
-                'Unit': ['ratio', 'ratio', 'ratio', 'ratio']
-            }
-            
-            efficiency_df = pd.DataFrame(efficiency_data)
+            # Efficiencies are derived from roof type, age and area
+            efficiency_df = derived.get('efficiency_df')
             st.dataframe(efficiency_df, hide_index=True, use_container_width=True)
             
             # Efficiency gauge chart
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number",
-                value = results.get('runoff_coefficient', 0) * 100,
-                title = {'text': "Runoff Efficiency (%)"},
-                gauge = {'axis': {'range': [0, 100]},
-                         'bar': {'color': "#1f77b4"},
-                         'steps': [
-                             {'range': [0, 50], 'color': "lightgray"},
-                             {'range': [50, 80], 'color': "gray"},
-                             {'range': [80, 100], 'color': "lightgreen"}]
-                        }
-            ))
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(derived.get('runoff_gauge_fig'), use_container_width=True)
         
         # Additional technical details
         st.markdown("### Technical Specifications")
@@ -465,26 +1021,141 @@ with tab3:
         
         with tech_col1:
             st.markdown("Structure Details")
-            st.write(f"Type: {results.get('recommended_structure', 'N/A')}")
-            st.write(f"Recommended Size: {results.get('roof_area', 0) * 0.8:.0f} liters capacity")
+            st.write(f"Type: {structure_label(*recommended_structure_for(structure_index, results))}")
+            st.write(f"Recommended Size: {derived.get('recommended_size'):.0f} liters capacity")
             st.write(f"Construction: Reinforced concrete/Plastic")
         
         with tech_col2:
             st.markdown("Installation Requirements")
-            st.write(f"Space Needed: {results.get('open_space', 0) * 0.3:.1f} sq.m")
+            st.write(f"Space Needed: {derived.get('space_needed'):.1f} sq.m")
             st.write(f"Timeframe: 2-4 weeks")
             st.write(f"Professional Help: Recommended")
         
         with tech_col3:
             st.markdown("Maintenance")
             st.write(f"Frequency: Quarterly cleaning")
-            st.write(f"Cost: ₹{results.get('installation_cost', 0) * 0.05:.0f}/year")
+            st.write(f"Cost: ₹{derived.get('maintenance_cost'):.0f}/year")
             st.write(f"Complexity: Low to Moderate")
     
     else:
         st.info("Complete the assessment to see detailed results.")
 
 with tab4:
+    st.markdown('<p class="sub-header">Compare Scenarios</p>', unsafe_allow_html=True)
+    
+    if st.session_state.calculation_done and st.session_state.user_data['results'] and st.session_state.last_payload:
+        base_payload = dict(st.session_state.last_payload)
+        scenarios = st.session_state.scenarios
+        
+        st.write("Define alternatives to your current assessment, e.g. a different roof type or more open space. "
+                 "Each distinct scenario is evaluated once by the backend; identical scenarios share a result.")
+        
+        # Scenario definition
+        if len(scenarios) < MAX_SCENARIOS:
+            with st.form("scenario_form", clear_on_submit=True):
+                label = st.text_input("Scenario Name", placeholder=f"Scenario {len(scenarios) + 1}")
+                scol1, scol2, scol3 = st.columns(3)
+                with scol1:
+                    scenario_roof_type = st.selectbox("Roof Type", ROOF_TYPES,
+                                                      index=ROOF_TYPES.index(base_payload['roof_type']) if base_payload['roof_type'] in ROOF_TYPES else 0)
+                    scenario_roof_age = st.slider("Roof Age (years)", min_value=0, max_value=50, value=base_payload['roof_age'])
+                with scol2:
+                    scenario_roof_area = st.number_input("Roof Area (sq. meters)", min_value=10, max_value=1000, value=base_payload['roof_area'])
+                    scenario_open_space = st.number_input("Available Open Space (sq. meters)", min_value=0, max_value=1000, value=base_payload['open_space'])
+                with scol3:
+                    scenario_dwellers = st.number_input("Number of Dwellers", min_value=1, max_value=50, value=base_payload['dwellers'])
+                
+                if st.form_submit_button("➕ Add Scenario"):
+                    scenarios.append({
+                        'label': label or f"Scenario {len(scenarios) + 1}",
+                        'roof_type': scenario_roof_type,
+                        'roof_age': scenario_roof_age,
+                        'roof_area': scenario_roof_area,
+                        'open_space': scenario_open_space,
+                        'dwellers': scenario_dwellers
+                    })
+                    st.rerun()
+        else:
+            st.info(f"You can compare up to {MAX_SCENARIOS} scenarios. Remove one to add another.")
+        
+        payloads = [dict(base_payload, **{key: value for key, value in scenario.items() if key != 'label'})
+                    for scenario in scenarios]
+        
+        with st.spinner("Evaluating scenarios..."):
+            evaluated = evaluate_scenarios(payloads, st.session_state.scenario_cache, st.session_state.scenario_failures)
+        
+        # Current assessment is always the first column and uses the results shown in the other tabs
+        if recommendation_is_stale():
+            current_status = "Structure, cost and payback from last full assessment"
+        else:
+            current_status = "OK"
+        labels = ["Current"] + [scenario['label'] for scenario in scenarios]
+        columns = [(st.session_state.user_data['results'], None, current_status)] + \
+                  [(scenario_result, error, "OK") for scenario_result, error in evaluated]
+        
+        if scenarios:
+            for i, scenario in enumerate(scenarios):
+                rcol1, rcol2 = st.columns([5, 1])
+                with rcol1:
+                    st.write(f"{scenario['label']}: {scenario['roof_type']} roof, {scenario['roof_area']} sq.m roof area, "
+                             f"{scenario['open_space']} sq.m open space, {scenario['roof_age']} years old, {scenario['dwellers']} dwellers")
+                with rcol2:
+                    if st.button("Remove", key=f"remove_scenario_{i}"):
+                        scenarios.pop(i)
+                        st.rerun()
+                
+                error = evaluated[i][1]
+                if error:
+                    ecol1, ecol2 = st.columns([5, 1])
+                    with ecol1:
+                        st.error(f"{scenario['label']} could not be evaluated: {error}")
+                    with ecol2:
+                        if st.button("Retry", key=f"retry_scenario_{i}"):
+                            st.session_state.scenario_failures.pop(scenario_key(payloads[i]), None)
+                            st.rerun()
+            
+            # Aligned metric table, one column per scenario
+            metric_rows = {}
+            fig = go.Figure()
+            for label, (scenario_result, error, status) in zip(labels, columns):
+                if scenario_result is None:
+                    metric_rows[label] = {'Status': "Evaluation failed" if error else "Not evaluated"}
+                    continue
+                scenario_metrics = DerivedMetrics(DERIVED_NODES, DERIVED_INPUTS)
+                scenario_metrics.set_inputs(scenario_result)
+                metric_rows[label] = {
+                    'Status': status,
+                    'Recommended Structure': structure_label(*recommended_structure_for(structure_index, scenario_result)),
+                    'Annual Harvestable Water (liters)': f"{scenario_metrics.get('annual_harvestable_water'):.0f}",
+                    'Potential Savings (liters/year)': f"{scenario_metrics.get('potential_savings'):.0f}",
+                    'Installation Cost (₹)': f"{scenario_metrics.get('installation_cost'):.0f}",
+                    'Payback Period (years)': f"{scenario_result.get('payback_period') or 0:.1f}",
+                    'Overall System Efficiency': f"{scenario_metrics.get('overall_efficiency'):.3f}",
+                    'Space Needed (sq.m)': f"{scenario_metrics.get('space_needed'):.1f}"
+                }
+                fig.add_trace(go.Scatter(x=list(range(1, 11)), y=scenario_metrics.get('cumulative_savings'),
+                                         mode='lines+markers', name=label))
+            
+            st.markdown("### Side-by-Side Metrics")
+            # Failed scenarios keep their column, with N/A for every metric
+            st.dataframe(pd.DataFrame(metric_rows).fillna("N/A"), use_container_width=True)
+            
+            if current_status != "OK":
+                st.caption("Open space changed since your last full assessment, so the Current column's structure, "
+                           "cost and payback are not directly comparable with the scenarios. Re-run the full "
+                           "assessment from the Recommendations tab to refresh them.")
+            
+            if fig.data:
+                st.markdown("### Cost-Benefit Comparison")
+                fig.add_hline(y=0, line_dash="dash", line_color="green", annotation_text="Break-even point")
+                fig.update_layout(title="10-Year Financial Projection", xaxis_title="Years", yaxis_title="Cumulative Savings (₹)")
+                st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Add a scenario above to compare it with your current assessment.")
+    else:
+        st.info("Complete the assessment to compare alternative scenarios.")
+
+with tab5:
     st.markdown('<p class="sub-header">Groundwater Information</p>', unsafe_allow_html=True)
     
     if st.session_state.calculation_done and st.session_state.user_data['results']:
@@ -535,7 +1206,7 @@ with tab4:
         impact_col1, impact_col2, impact_col3 = st.columns(3)
         
         with impact_col1:
-            st.metric("Groundwater Recharge Potential", f"{results.get('annual_harvestable_water', 0) * 0.7:.0f} liters/year")
+            st.metric("Groundwater Recharge Potential", f"{derived.get('recharge_potential'):.0f} liters/year")
         
         with impact_col2:
             # Random value between 0.8-1.5 tons based on harvestable water
@@ -550,7 +1221,7 @@ with tab4:
     else:
         st.info("Complete the assessment to see groundwater information for your location.")
 
-with tab5:
+with tab6:
     st.markdown('<p class="sub-header">About This Tool</p>', unsafe_allow_html=True)
     
     st.markdown("""
@@ -742,4 +1413,7 @@ with st.sidebar.form("feedback_form"):
     feedback_submitted = st.form_submit_button("Submit Feedback")
     
     if feedback_submitted:
-        st.sidebar.success("Thank you for your feedback!")
+        if get_feedback_writer().submit(rating, comments):
+            st.sidebar.success("Thank you for your feedback!")
+        else:
+            st.sidebar.warning("We're receiving a lot of feedback right now. Please try again in a moment.")